@@ -45,11 +45,31 @@ def test_delay_args(delay_parser):
     assert args.wmLoc is None
     assert args.zref == 20000.0
     assert args.outformat is None
+    assert args.nGauss is None
     assert args.out == 'test/scenario_1/'
     assert args.download_only is False
     assert args.verbose == 1
 
 
+def test_delay_args_nGauss(delay_parser):
+    args = delay_parser.parse_args([
+        '--date', '20200103',
+        '--time', '23:00:00',
+        '--latlon', 'latfile.dat', 'lonfile.dat',
+        '--nGauss', '16'
+    ])
+    assert args.nGauss == 16
+
+    for value in ('0', '-4'):
+        with pytest.raises(SystemExit):
+            delay_parser.parse_args([
+                '--date', '20200103',
+                '--time', '23:00:00',
+                '--latlon', 'latfile.dat', 'lonfile.dat',
+                '--nGauss', value
+            ])
+
+
 def test_delay_los_mutually_exclusive(delay_parser):
     with pytest.raises(SystemExit):
         delay_parser.parse_args([
@@ -2,9 +2,15 @@ import os
 from test import TEST_DIR, pushd
 import pytest
 
+import h5py
 import numpy as np
+from pyproj import CRS
+from pyproj.exceptions import CRSError
 
-from RAiDER.delayFcns import get_delays
+from RAiDER.constants import Zenith
+from RAiDER.delayFcns import calculate_rays, get_delays
+from RAiDER.losreader import getLookVectors
+from RAiDER.utilFcns import writePnts2HDF5
 
 # FIXME: Relying on prior setup to be performed in order for test to pass.
 # This file should either by committed as test data, or set up by a fixture
@@ -23,8 +29,8 @@ MODEL_FILE = os.path.join(
 )
 
 
-@pytest.mark.skipif(~os.path.exists(MODEL_FILE) or
-                    ~os.path.exists(POINTS_FILE),
+@pytest.mark.skipif(not os.path.exists(MODEL_FILE) or
+                    not os.path.exists(POINTS_FILE),
                     reason="Will not pass until the test_scenario_*'s have run")
 def test_get_delays_accuracy(tmp_path):
     stepSize = 15.0
@@ -48,3 +54,88 @@ def test_get_delays_accuracy(tmp_path):
         )
         assert np.allclose(delays_wet_1, delays_wet_4)
         assert np.allclose(delays_hydro_1, delays_hydro_4)
+
+
+def make_weather_model_file(filename, projection=None):
+    """Write a small lat/lon weather model grid with exponential profiles."""
+    xs = np.linspace(19, 23, 9)
+    ys = np.linspace(9, 13, 9)
+    zs = np.linspace(-100, 20000, 202)
+    shape = (len(ys), len(xs), len(zs))
+    wet = np.broadcast_to(60 * np.exp(-zs / 2000), shape)
+    hydro = np.broadcast_to(280 * np.exp(-zs / 8000), shape)
+    if projection is None:
+        projection = CRS.from_epsg(4326).to_json()
+
+    with h5py.File(filename, 'w') as f:
+        f['x'] = xs
+        f['y'] = ys
+        f['z'] = zs
+        f['wet'] = wet
+        f['hydro'] = hydro
+        f.create_dataset('Projection', data=projection)
+
+
+def make_points_file(filename, chunkSize):
+    """Write a 7 x 9 grid of zenith query points."""
+    lats, lons = np.meshgrid(np.linspace(10, 12, 7), np.linspace(20, 22, 9), indexing='ij')
+    # Heights start above 0, which is the NoDataValue of the points file
+    hgts = np.linspace(10, 1000, lats.size).reshape(lats.shape)
+    los = getLookVectors(Zenith, lats, lons, hgts)
+    writePnts2HDF5(lats, lons, hgts, los, outName=filename, chunkSize=chunkSize)
+    calculate_rays(filename)
+
+
+def test_get_delays_bad_weather_model_raises(tmp_path):
+    points_file = str(tmp_path / 'query_points.h5')
+    model_file = str(tmp_path / 'weather_model.h5')
+    make_points_file(points_file, (3, 4))
+    make_weather_model_file(model_file, projection='not a projection')
+
+    with pushd(tmp_path):
+        with pytest.raises(CRSError):
+            get_delays(15.0, points_file, model_file, cpu_num=2)
+
+
+@pytest.mark.parametrize('nGauss', [0, -1])
+def test_get_delays_bad_nGauss_raises(tmp_path, nGauss):
+    with pytest.raises(ValueError):
+        get_delays(15.0, 'query_points.h5', 'weather_model.h5', nGauss=nGauss)
+
+
+def test_get_delays_multiple_chunks(tmp_path):
+    model_file = str(tmp_path / 'weather_model.h5')
+    make_weather_model_file(model_file)
+
+    # (3, 4) does not divide the 7 x 9 grid, so the edge chunks are smaller
+    chunked_file = str(tmp_path / 'query_points_chunked.h5')
+    single_file = str(tmp_path / 'query_points_single.h5')
+    make_points_file(chunked_file, (3, 4))
+    make_points_file(single_file, (7, 9))
+
+    with pushd(tmp_path):
+        wet, hydro = get_delays(15.0, chunked_file, model_file, cpu_num=2)
+        wet_1, hydro_1 = get_delays(15.0, single_file, model_file, cpu_num=1)
+
+    assert wet.shape == hydro.shape == (7, 9)
+    assert np.all(np.isfinite(wet)) and np.all(np.isfinite(hydro))
+    assert np.array_equal(wet, wet_1)
+    assert np.array_equal(hydro, hydro_1)
+    # The points get higher along the grid, so their delays must get smaller
+    assert np.all(np.diff(hydro.ravel()) < 0)
+
+
+def test_get_delays_gauss_legendre_matches_dense(tmp_path):
+    points_file = str(tmp_path / 'query_points.h5')
+    model_file = str(tmp_path / 'weather_model.h5')
+    make_points_file(points_file, (3, 4))
+    make_weather_model_file(model_file)
+
+    with pushd(tmp_path):
+        wet_dense, hydro_dense = get_delays(1.0, points_file, model_file, cpu_num=2)
+        wet_gauss, hydro_gauss = get_delays(15.0, points_file, model_file, cpu_num=2, nGauss=16)
+
+    # Both integrate over the same ray lengths, so they must agree to well
+    # under a millimeter
+    assert np.allclose(wet_gauss, wet_dense, rtol=0, atol=5e-4)
+    assert np.allclose(hydro_gauss, hydro_dense, rtol=0, atol=5e-4)
@@ -41,3 +41,64 @@ def test_integrate_along_axis_large():
             np.apply_along_axis(np.trapz, 2, y[..., level:], x=x[level:]),
             np.trapz(y[..., level:], x[level:], axis=2)
         )
+
+
+def test_integrate_delays_matches_per_ray_sum():
+    from RAiDER.delayFcns import _integrate_delays
+
+    refr = np.random.standard_normal(2_000).reshape(20, 100)
+    refr[3, 10] = np.nan
+    Npts = np.random.randint(0, 101, size=20)
+    stepSize = 15.
+
+    expected = [1e-6 * stepSize * np.nansum(ray[:n]) for ray, n in zip(refr, Npts)]
+    assert np.allclose(_integrate_delays(stepSize, refr, Npts), expected)
+
+    expected = [1e-6 * stepSize * np.nansum(ray) for ray in refr]
+    assert np.allclose(_integrate_delays(stepSize, refr), expected)
+
+
+def test_integrateLOS_returns_separate_delays():
+    from RAiDER.delayFcns import _integrateLOS
+
+    wet = np.ones((3, 4, 50))
+    hydro = 2 * np.ones((3, 4, 50))
+
+    wet_total, hydro_total = _integrateLOS(10., wet, hydro)
+
+    assert wet_total.shape == (3, 4)
+    assert hydro_total.shape == (3, 4)
+    assert np.allclose(wet_total, 1e-6 * 10. * 50)
+    assert np.allclose(hydro_total, 2e-6 * 10. * 50)
+
+
+def test_integrateZenith():
+    from RAiDER.delayFcns import _integrateZenith
+
+    zs = np.array([0., 1., 3., 6.])
+    wet = np.ones((2, 2, 4)) * 1e6
+    hydro = np.broadcast_to(zs * 1e6, (2, 2, 4))
+
+    wet_total, hydro_total = _integrateZenith(zs, wet, hydro)
+
+    assert np.allclose(wet_total, np.array([6., 5., 3., 0.]))
+    assert np.allclose(hydro_total, np.array([18., 17.5, 13.5, 0.]))
+
+
+def test_gaussLegendreRays():
+    from RAiDER.delayFcns import _gaussLegendreRays
+
+    SP = np.array([[0., 0., 0.], [10., 20., 30.]])
+    SLV = np.array([[0., 0., 1.], [1., 0., 0.]])
+    lengths = np.array([1000., 500.])
+
+    ray, weights = _gaussLegendreRays(SP, SLV, lengths, 8)
+
+    assert ray.shape == (2, 3, 8)
+    assert weights.shape == (2, 8)
+    assert np.allclose(weights.sum(axis=-1), lengths)
+    # All points lie on the ray, between the start point and its end
+    dists = np.sum((ray - SP[..., np.newaxis]) * SLV[..., np.newaxis], axis=1)
+    assert np.all((dists > 0) & (dists < lengths[:, np.newaxis]))
+    # Exact for a low order polynomial in distance along the ray
+    assert np.allclose(np.sum(weights * dists**3, axis=-1), lengths**4 / 4)
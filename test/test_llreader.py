@@ -0,0 +1,19 @@
+import numpy as np
+
+from RAiDER.llreader import getHeights
+
+
+def test_getHeights_lvs():
+    lats = np.array([[10., 11., 12.], [13., 14., 15.]])
+    lons = lats + 100
+    levels = [0., 100., 200., 500.]
+
+    out_lats, out_lons, hts = getHeights(lats, lons, ('lvs', levels))
+
+    assert out_lats.shape == (2, 3, 4)
+    assert out_lons.shape == (2, 3, 4)
+    assert hts.shape == (2, 3, 4)
+    for k, level in enumerate(levels):
+        assert np.array_equal(out_lats[..., k], lats)
+        assert np.array_equal(out_lons[..., k], lons)
+        assert np.all(hts[..., k] == level)
@@ -0,0 +1,74 @@
+import numpy as np
+import pyproj
+
+from RAiDER.losreader import state_to_los
+
+
+def enu_basis(lats, lons):
+    lat, lon = np.radians(lats), np.radians(lons)
+    east = np.stack((-np.sin(lon), np.cos(lon), np.zeros_like(lon)), axis=-1)
+    up = np.stack(
+        (np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)),
+        axis=-1
+    )
+    return east, up
+
+
+class MockGeo2rdr:
+    """Report a sensor 37 degrees off zenith, towards the east, of every point."""
+
+    def set_orbit(self, *args):
+        pass
+
+    def set_geo_coordinate(self, lon, lat, *args):
+        self.lon = 360 - np.degrees(lon)
+        self.lat = np.degrees(lat)
+
+    def geo2rdr(self):
+        pass
+
+    def get_los(self):
+        east, up = enu_basis(self.lat, self.lon)
+        # Geo2rdr points from the sensor to the ground, with arbitrary length
+        return -2 * (0.8 * up + 0.6 * east)
+
+
+def test_state_to_los(monkeypatch):
+    monkeypatch.setattr('RAiDER.losreader.Geo2rdr.PyGeo2rdr', MockGeo2rdr)
+
+    lats = np.array([[10., 10.5, 11.], [12., 12.5, 13.]])
+    lons = np.array([[-100., -101., -102.], [-103., -104., -105.]])
+    heights = np.array([[0., 100., 200.], [300., 400., 500.]])
+    zref = 15000.
+    sv = np.zeros(4)
+
+    los = state_to_los(sv, sv, sv, sv, sv, sv, sv, lats, lons, heights, zref=zref)
+
+    assert los.shape == (2, 3, 3)
+    east, up = enu_basis(lats, lons)
+    expected_dir = 0.8 * up + 0.6 * east
+    lengths = np.linalg.norm(los, axis=-1)
+    # Each vector points along its own LOS, up to height zref
+    assert np.allclose(los / lengths[..., np.newaxis], expected_dir)
+    assert np.allclose(np.sum(los * up, axis=-1), zref - heights)
+
+    t = pyproj.Transformer.from_crs(4326, 4978, always_xy=True)
+    start = np.stack(t.transform(lons, lats, heights), axis=-1)
+    _, _, end_hgts = t.transform(*np.moveaxis(start + los, -1, 0), direction='INVERSE')
+    # The range is computed for a locally flat earth, which leaves the top
+    # of each ray a few meters above zref
+    assert np.allclose(end_hgts, zref, atol=20)
+
+
+def test_state_to_los_above_zref(monkeypatch):
+    monkeypatch.setattr('RAiDER.losreader.Geo2rdr.PyGeo2rdr', MockGeo2rdr)
+
+    lats = np.array([10., 11., 12.])
+    lons = np.array([-100., -101., -102.])
+    heights = np.array([100., 15000., 20000.])
+    sv = np.zeros(4)
+
+    los = state_to_los(sv, sv, sv, sv, sv, sv, sv, lats, lons, heights, zref=15000.)
+
+    assert np.all(np.isfinite(los[0]))
+    assert np.all(np.isnan(los[1:]))
@@ -1,5 +1,5 @@
 import os
-from datetime import time
+from datetime import datetime, time, timedelta
 from test import TEST_DIR
 
 import h5py
@@ -8,8 +8,8 @@ import pytest
 from osgeo import gdal
 
 from RAiDER.utilFcns import (
-    _least_nonzero, cosd, gdal_open, makeDelayFileNames, sind,
-    writeArrayToRaster, writeResultsToHDF5
+    _least_nonzero, cosd, gdal_open, makeDelayFileNames, rotate_enu2ecef,
+    round_date, sind, writeArrayToRaster, writeResultsToHDF5
 )
 
 
@@ -109,6 +109,21 @@ def test_cosd():
     )
 
 
+def test_rotate_enu2ecef():
+    lats = np.array([0., 0., 45., 90.])
+    lons = np.array([0., 90., 30., -60.])
+    zeros = np.zeros(lats.shape)
+
+    up = np.stack(rotate_enu2ecef(zeros, zeros, np.ones(lats.shape), lats, lons), axis=-1)
+    assert np.allclose(
+        up,
+        np.stack((cosd(lats) * cosd(lons), cosd(lats) * sind(lons), sind(lats)), axis=-1)
+    )
+
+    east = np.stack(rotate_enu2ecef(np.ones(lats.shape), zeros, zeros, lats, lons), axis=-1)
+    assert np.allclose(east, np.stack((-sind(lons), cosd(lons), zeros), axis=-1))
+
+
 def test_gdal_open():
     out = gdal_open(os.path.join(TEST_DIR, "test_geom", "lat.rdr"), False)
 
@@ -238,3 +253,14 @@ def test_least_nonzero_2():
         atol=1e-16,
         equal_nan=True
     )
+
+
+def test_round_date():
+    precision = timedelta(hours=6)
+
+    assert round_date(datetime(2020, 1, 3, 6, 0), precision) == datetime(2020, 1, 3, 6, 0)
+    assert round_date(datetime(2020, 1, 3, 8, 59), precision) == datetime(2020, 1, 3, 6, 0)
+    assert round_date(datetime(2020, 1, 3, 9, 1), precision) == datetime(2020, 1, 3, 12, 0)
+    assert round_date(datetime(2020, 1, 3, 21, 30), precision) == datetime(2020, 1, 4, 0, 0)
+    # Ties round down
+    assert round_date(datetime(2020, 1, 3, 9, 0), precision) == datetime(2020, 1, 3, 6, 0)
@@ -0,0 +1,39 @@
+import os
+from test import TEST_DIR
+
+import numpy as np
+import xarray
+
+from RAiDER.models.era5 import ERA5
+from RAiDER.utilFcns import _geo_to_ht
+
+# Latitudes in this file are stored in descending order
+WEATHER_FILE = os.path.join(
+    TEST_DIR,
+    "scenario_0",
+    "weather_files",
+    "ERA-5_2019_01_01_T02_00_00.nc"
+)
+
+
+def test_load_pressure_level_ordering():
+    model = ERA5()
+    model._load_pressure_level(WEATHER_FILE)
+
+    # The grid is (lat, lon, height) with each axis increasing
+    assert np.all(np.diff(model._lats[:, 0, 0]) > 0)
+    assert np.all(np.diff(model._lons[0, :, 0]) > 0)
+    assert np.all(np.diff(model._zs, axis=2) > 0)
+    assert np.all(np.diff(model._p, axis=2) < 0)
+
+    with xarray.open_dataset(WEATHER_FILE) as ds:
+        ds = ds.isel(time=0).sortby('latitude').sortby('longitude')
+        # Highest pressure, i.e. the lowest level, first
+        ds = ds.sortby('level', ascending=False)
+        lats = ds['latitude'].values[:, np.newaxis, np.newaxis]
+        t = np.moveaxis(ds['t'].values, 0, -1)
+        z = np.moveaxis(ds['z'].values, 0, -1)
+
+    # Temperatures and heights must be on the same grid
+    assert np.allclose(model._t, t)
+    assert np.allclose(model._zs, _geo_to_ht(lats, z / model._g0, model._g0))
@@ -7,8 +7,10 @@ from functools import reduce
 import numpy as np
 import pytest
 from numpy import nan
+from pyproj import CRS
 
 from RAiDER.models.weatherModel import WeatherModel
+from test.test_losreader import MockGeo2rdr
 
 
 def product(iterable):
@@ -98,3 +100,111 @@ def test_uniform_in_z_large(model):
                        interpolated * 3, equal_nan=True, rtol=0)
 
     assert np.allclose(model._zs, zlevels, atol=0.05, rtol=0)
+
+
+@pytest.mark.parametrize('use_numba', [True, False])
+def test_find_svp(model, monkeypatch, use_numba):
+    if use_numba:
+        pytest.importorskip('numba')
+    else:
+        # Force the pure numpy path
+        monkeypatch.setattr('RAiDER.models.weatherModel._svp_kernel', None)
+
+    t1 = 273.15
+    t2 = 250.15
+    model._t = np.array([[[t1 + 20., t1, 260., t2, t2 - 20., nan]]])
+
+    model._find_svp()
+
+    tref = model._t - t1
+    wgt = (model._t - t2) / (t1 - t2)
+    svpw = 6.1121 * np.exp((17.502 * tref) / (240.97 + tref))
+    svpi = 6.1121 * np.exp((22.587 * tref) / (273.86 + tref))
+    expected = 100 * np.array([[[
+        svpw[0, 0, 0],
+        svpw[0, 0, 1],
+        svpi[0, 0, 2] + (svpw[0, 0, 2] - svpi[0, 0, 2]) * wgt[0, 0, 2]**2,
+        svpi[0, 0, 3],
+        svpi[0, 0, 4],
+        nan
+    ]]])
+
+    assert model._svp.shape == model._t.shape
+    assert np.allclose(model._svp, expected, equal_nan=True)
+    assert np.isclose(model._svp[0, 0, 1], 611.21)
+
+
+def test_calculategeoh(model):
+    model._levels = [1, 2, 3]
+    model._a = [0., 2000., 1000., 0.]
+    model._b = [0., 0., 0.5, 1.]
+    model._t = np.array([220., 250., 280.]).reshape(3, 1, 1) * np.ones((3, 1, 2))
+    model._q = np.array([0., 0.001, 0.01]).reshape(3, 1, 1) * np.ones((3, 1, 2))
+    z = np.array([[0., 9806.65]])
+    lnsp = np.log(np.array([[1e5, 9e4]]))
+
+    geopotential, pressurelvs, geoheight = model._calculategeoh(z, lnsp)
+
+    assert np.allclose(
+        geopotential,
+        np.array([
+            [[330782.68331211526, 333004.00304673455]],
+            [[116764.35541470195, 125653.14766646209]],
+            [[24192.372797261356, 33930.456372798515]]
+        ])
+    )
+    assert np.allclose(
+        pressurelvs,
+        np.array([
+            [[0., 0.]],
+            [[2000., 2000.]],
+            [[51000., 46000.]]
+        ])
+    )
+    assert np.allclose(geoheight, geopotential / model._g0)
+
+
+def test_calculategeoh_level_mismatch(model):
+    model._levels = [1, 2, 3]
+    model._a = [0., 1.]
+    model._b = [0., 1.]
+
+    with pytest.raises(ValueError):
+        model._calculategeoh(np.zeros((1, 1)), np.zeros((1, 1)))
+
+
+def test_runLOS_sv(model, monkeypatch):
+    monkeypatch.setattr('RAiDER.losreader.Geo2rdr.PyGeo2rdr', MockGeo2rdr)
+    monkeypatch.setattr(
+        'RAiDER.losreader.read_txt_file', lambda *args: [np.zeros(4)] * 7
+    )
+
+    lons = np.arange(-100., -95.)
+    lats = np.arange(30., 34.)
+    zs = np.array([0., 5000., 10000., 15000., 20000., 40000.])
+    model._xs, model._ys, model._zs = lons, lats, zs
+    model._lats, model._lons, _ = np.meshgrid(lats, lons, zs, indexing='ij')
+    model._proj = CRS.from_epsg(4326)
+    # Linear in height, so the interpolated refractivity is exact
+    model._wet_refractivity = np.broadcast_to(60. - 1e-3 * zs, model._lats.shape)
+    model._hydrostatic_refractivity = np.broadcast_to(300. - 5e-3 * zs, model._lats.shape)
+
+    model._runLOS(('sv', 'orbit.txt'), None, True)
+
+    assert model._wet_total.shape == model._lats.shape
+    assert model._hydrostatic_total.shape == model._lats.shape
+
+    # Nodes at or above zmax have nothing to integrate
+    above = zs >= model._zmax
+    assert np.all(model._wet_total[..., above] == 0)
+    assert np.all(model._hydrostatic_total[..., above] == 0)
+
+    # Below zmax the delay is the zenith delay scaled by 1 / cos(incidence).
+    # The rays head east and, following the curve of the earth, slightly
+    # south, so those from the eastern and southern edges leave the grid.
+    h = zs[~above]
+    zmax = model._zmax
+    wet = 1e-6 * (60. * (zmax - h) - 5e-4 * (zmax**2 - h**2)) / 0.8
+    hydro = 1e-6 * (300. * (zmax - h) - 2.5e-3 * (zmax**2 - h**2)) / 0.8
+    assert np.allclose(model._wet_total[1:, :-1, ~above], wet, rtol=1e-2)
+    assert np.allclose(model._hydrostatic_total[1:, :-1, ~above], hydro, rtol=1e-2)
@@ -28,7 +28,7 @@ log = logging.getLogger(__name__)
 def interpolateDelay(weather_model_file_name, pnts_file_name,
                      zlevels=None, zref=_ZREF, stepSize=_STEP,
                      interpType='rgi', nproc=8,
-                     useDask=False, delayType="Zenith"):
+                     useDask=False, delayType="Zenith", nGauss=None):
     """
     This function calculates the line-of-sight vectors, estimates the point-wise refractivity
     index for each one, and then integrates to get the total delay in meters. The point-wise
@@ -45,6 +45,8 @@ def interpolateDelay(weather_model_file_name, pnts_file_name,
                   Any other string will use the RegularGridInterpolate method
      nproc      - Number of parallel processes to use if useDask is True
      useDask    - use Dask to parallelize ray calculation
+     nGauss     - If given, integrate each ray with an nGauss-point Gauss-Legendre
+                  rule instead of sampling it every stepSize meters
 
     Outputs:
      delays     - A list containing the wet and hydrostatic delays for each ground point in
@@ -57,13 +59,13 @@ def interpolateDelay(weather_model_file_name, pnts_file_name,
     RAiDER.delayFcns.calculate_rays(pnts_file_name, stepSize)
     return RAiDER.delayFcns.get_delays(
         stepSize, pnts_file_name, weather_model_file_name,
-        interpType=interpType, delayType=delayType
+        interpType=interpType, delayType=delayType, nGauss=nGauss
     )
 
 
 def computeDelay(weather_model_file_name, pnts_file_name, useWeatherNodes=False,
                  zlevels=None, zref=_ZREF, out=None, parallel=False,
-                 delayType="Zenith"):
+                 delayType="Zenith", nGauss=None):
     """Calculate troposphere delay from command-line arguments.
 
     We do a little bit of preprocessing, then call
@@ -97,17 +99,20 @@ def computeDelay(weather_model_file_name, pnts_file_name, useWeatherNodes=False,
     else:
         wet, hydro = interpolateDelay(weather_model_file_name, pnts_file_name, zlevels=zlevels,
                                       zref=zref, nproc=nproc, useDask=useDask,
-                                      delayType=delayType)
+                                      delayType=delayType, nGauss=nGauss)
         log.debug('Finished delay calculation')
 
         return wet, hydro
 
 
 def tropo_delay(los, lats, lons, ll_bounds, heights, flag, weather_model, wmLoc, zref,
-                outformat, time, out, download_only, wetFilename, hydroFilename):
+                outformat, time, out, download_only, wetFilename, hydroFilename,
+                nGauss=None):
     """
     raiderDelay main function.
     """
+    if nGauss is not None and nGauss < 1:
+        raise ValueError('nGauss must be a positive integer, got {}'.format(nGauss))
 
     log.debug('Starting to run the weather model calculation')
     log.debug('Time type: %s', type(time))
@@ -176,7 +181,7 @@ def tropo_delay(los, lats, lons, ll_bounds, heights, flag, weather_model, wmLoc,
 
     wetDelay, hydroDelay = computeDelay(
         weather_model_file, pnts_file, useWeatherNodes, zref, out,
-        delayType=delayType
+        delayType=delayType, nGauss=nGauss
     )
 
     if heights[0] == 'lvs':
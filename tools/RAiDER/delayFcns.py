@@ -43,13 +43,15 @@ def getUnitLVs(pnts_file):
     '''
     Get a set of look vectors normalized by their lengths
     '''
-    get_lengths(pnts_file)
     with h5py.File(pnts_file, 'r+') as f:
-        slv = f['LOS'][()] / f['Rays_len'][()][..., np.newaxis]
-        f['Rays_SLV'][...] = slv
+        los = f['LOS'][()]
+        lengths = get_lengths(los)
+        f['Rays_len'][:] = lengths
+        f['Rays_len'].attrs['MaxLen'] = np.nanmax(lengths)
+        f['Rays_SLV'][...] = los / lengths[..., np.newaxis]
 
 
-def get_lengths(pnts_file):
+def get_lengths(look_vecs):
     '''
     Returns the lengths of a vector or set of vectors, fast.
     Inputs:
@@ -60,15 +62,13 @@ def get_lengths(pnts_file):
        lengths     - an Nx1 numpy array containing the absolute distance in
                      meters of the top of the atmosphere from the ground pnt.
     '''
-    with h5py.File(pnts_file, 'r+') as f:
-        lengths = np.linalg.norm(f['LOS'][()], axis=-1)
-        try:
-            lengths[~np.isfinite(lengths)] = 0
-        except TypeError:
-            if ~np.isfinite(lengths):
-                lengths = 0
-        f['Rays_len'][:] = lengths.astype(np.float64)
-        f['Rays_len'].attrs['MaxLen'] = np.nanmax(lengths)
+    lengths = np.linalg.norm(look_vecs, axis=-1)
+    try:
+        lengths[~np.isfinite(lengths)] = 0
+    except TypeError:
+        if ~np.isfinite(lengths):
+            lengths = 0
+    return lengths.astype(np.float64)
 
 
 def lla2ecef(pnts_file):
@@ -89,10 +89,18 @@ def lla2ecef(pnts_file):
 
 
 def get_delays(stepSize, pnts_file, wm_file, interpType='3D',
-               delayType="Zenith", cpu_num=0):
+               delayType="Zenith", cpu_num=0, nGauss=None):
     '''
     Create the integration points for each ray path.
+
+    By default each ray is sampled every stepSize meters. If nGauss is given,
+    each ray is instead integrated with an nGauss-point Gauss-Legendre rule,
+    which needs far fewer weather model evaluations for the smooth
+    refractivity profiles. Both integrate every ray from 0 to the length of
+    the longest ray, so either can be used to check the other.
     '''
+    if nGauss is not None and nGauss < 1:
+        raise ValueError('nGauss must be a positive integer, got {}'.format(nGauss))
 
     t0 = time.time()
 
@@ -118,15 +126,33 @@ def get_delays(stepSize, pnts_file, wm_file, interpType='3D',
     Nchunks = len(CHUNKS)
 
     with h5py.File(pnts_file, 'r') as f:
-        chunk_inputs = [(kk, CHUNKS[kk], np.array(f['Rays_SP']), np.array(f['Rays_SLV']),
-                         chunkSize, stepSize, ifWet, ifHydro, max_len, wm_file) for kk in range(Nchunks)]
-
-        with mp.Pool() as pool:
-            individual_results = pool.starmap(process_chunk, chunk_inputs)
-        delays = np.concatenate(individual_results)
+        SP = f['Rays_SP'][()]
+        SLV = f['Rays_SLV'][()]
 
-    wet_delay = delays[0, ...].reshape(in_shape)
-    hydro_delay = delays[1, ...].reshape(in_shape)
+    # Set up the ECEF to weather model transform here, so a bad weather model
+    # file raises now; a failing Pool initializer would be respawned forever
+    proj_wm = getProjFromWMFile(wm_file)
+    Transformer.from_proj(CRS.from_epsg(4978), proj_wm, always_xy=True)
+
+    # The ray and weather model arrays are handed to each worker once, when
+    # it starts, so each job only needs to carry the indices of its chunk
+    chunk_inputs = [
+        (kk, CHUNKS[kk], chunkSize, stepSize, max_len, nGauss) for kk in range(Nchunks)
+    ]
+    with mp.Pool(
+        processes=cpu_num if cpu_num > 0 else None,
+        initializer=_init_chunk_worker,
+        initargs=(SP, SLV, ifWet, ifHydro, proj_wm.to_wkt())
+    ) as pool:
+        # Each chunk is a rectangular block of the output, so the results
+        # can be written as they arrive with one slice assignment per block
+        wet_delay = np.full(tuple(in_shape), np.nan, dtype=np.float64)
+        hydro_delay = np.full(tuple(in_shape), np.nan, dtype=np.float64)
+        for k, (wet, hydro) in pool.imap(_process_chunk_job, chunk_inputs):
+            block = tuple(slice(ind[0], ind[-1] + 1) for ind in CHUNKS[k])
+            block_shape = tuple(b.stop - b.start for b in block)
+            wet_delay[block] = wet.reshape(block_shape)
+            hydro_delay[block] = hydro.reshape(block_shape)
 
     time_elapse = (time.time() - t0)
     with open('get_delays_time_elapse.txt', 'w') as f:
@@ -240,37 +266,110 @@ def makeChunksFromInds(startInd, chunkSize, in_shape):
     return chunks
 
 
-def process_chunk(k, chunkInds, SP, SLV, chunkSize, stepSize, ifWet, ifHydro, max_len, wm_file):
+# Per-process state shared by every chunk; populated by _init_chunk_worker
+_chunk_worker_data = {}
+
+
+def _init_chunk_worker(SP, SLV, ifWet, ifHydro, wm_proj_wkt):
     """
-    Perform the interpolation and integration over a single chunk.
+    Store the data needed by process_chunk in the worker process, so that
+    it is transferred once per process rather than once per chunk.
+    Any error is kept and raised by process_chunk instead, since
+    multiprocessing.Pool keeps restarting workers whose initializer fails.
     """
-    # Transformer from ECEF to weather model
-    p1 = CRS.from_epsg(4978)
-    proj_wm = getProjFromWMFile(wm_file)
-    t = Transformer.from_proj(p1, proj_wm, always_xy=True)
+    try:
+        # Transformer from ECEF to weather model
+        p1 = CRS.from_epsg(4978)
+        proj_wm = CRS.from_wkt(wm_proj_wkt)
+
+        _chunk_worker_data['SP'] = SP
+        _chunk_worker_data['SLV'] = SLV
+        _chunk_worker_data['ifWet'] = ifWet
+        _chunk_worker_data['ifHydro'] = ifHydro
+        _chunk_worker_data['transformer'] = Transformer.from_proj(p1, proj_wm, always_xy=True)
+    except Exception as e:
+        _chunk_worker_data['error'] = e
+
+
+def process_chunk(k, chunkInds, chunkSize, stepSize, max_len, nGauss=None):
+    """
+    Perform the interpolation and integration over a single chunk. The ray
+    and weather model data must first be set up by _init_chunk_worker.
+    If nGauss is given, use Gauss-Legendre quadrature over the same 0 to
+    max_len as the dense sampling, instead of sampling every stepSize meters.
+    """
+    if 'error' in _chunk_worker_data:
+        raise _chunk_worker_data['error']
+
+    SP = _chunk_worker_data['SP']
+    SLV = _chunk_worker_data['SLV']
+    ifWet = _chunk_worker_data['ifWet']
+    ifHydro = _chunk_worker_data['ifHydro']
+    t = _chunk_worker_data['transformer']
 
     # datatype must be specific for the cython makePoints* function
     _DTYPE = np.float64
 
-    # H5PY does not support fancy indexing with tuples, hence this if/else check
-    if len(chunkSize) == 1:
-        row = chunkInds[0]
-        ray = makePoints1D(max_len, SP[row, :].astype(_DTYPE), SLV[row, :].astype(_DTYPE), stepSize)
-    elif len(chunkSize) == 2:
-        row, col = chunkInds
-        ray = makePoints1D(max_len, SP[row, col, :].astype(_DTYPE), SLV[row, col, :].astype(_DTYPE), stepSize)
-    elif len(chunkSize) == 3:
-        row, col, zind = chunkInds
-        ray = makePoints1D(max_len, SP[row, col, zind, :].astype(_DTYPE), SLV[row, col, zind, :].astype(_DTYPE), stepSize)
-    else:
+    if len(chunkSize) > 3:
         raise RuntimeError('Data in more than 4 dimensions is not supported')
 
+    # Gather the start points and unit look vectors of every ray in the chunk
+    # with a single fancy index; the result is already a fresh array, so the
+    # cast only copies if the stored dtype differs.
+    index = tuple(chunkInds)
+    if nGauss is None:
+        ray = makePoints1D(
+            max_len,
+            SP[index].astype(_DTYPE, copy=False),
+            SLV[index].astype(_DTYPE, copy=False),
+            stepSize
+        )
+    else:
+        ray, weights = _gaussLegendreRays(
+            SP[index].astype(_DTYPE, copy=False),
+            SLV[index].astype(_DTYPE, copy=False),
+            np.full(len(index[0]), max_len),
+            nGauss
+        )
+
     ray_x, ray_y, ray_z = t.transform(ray[..., 0, :], ray[..., 1, :], ray[..., 2, :])
-    delay_wet = interpolate2(ifWet, ray_x, ray_y, ray_z)
-    delay_hydro = interpolate2(ifHydro, ray_x, ray_y, ray_z)
-    int_delays = _integrateLOS(stepSize, delay_wet, delay_hydro)
+    delay_wet, delay_hydro = interpolate_all((ifWet, ifHydro), ray_x, ray_y, ray_z)
+    if nGauss is None:
+        wet_int, hydro_int = _integrateLOS(stepSize, delay_wet, delay_hydro)
+    else:
+        wet_int = 1e-6 * np.nansum(delay_wet * weights, axis=-1)
+        hydro_int = 1e-6 * np.nansum(delay_hydro * weights, axis=-1)
 
-    return int_delays
+    return wet_int, hydro_int
+
+
+def _gaussLegendreRays(SP, SLV, lengths, nGauss):
+    '''
+    Create the Gauss-Legendre integration points along each ray.
+    Inputs:
+      SP      - N x 3 array of ray start points (ECEF)
+      SLV     - N x 3 array of unit look vectors (ECEF)
+      lengths - length-N array of ray lengths in meters
+      nGauss  - number of quadrature points per ray
+    Outputs:
+      ray     - N x 3 x nGauss array of the quadrature points, laid out like
+                the output of makePoints1D
+      weights - N x nGauss array of the quadrature weights in meters
+    '''
+    nodes, w = np.polynomial.legendre.leggauss(nGauss)
+    # Map the nodes from [-1, 1] onto [0, length] for each ray
+    half_len = 0.5 * lengths[..., np.newaxis]
+    dists = half_len * (nodes + 1)
+    weights = half_len * w
+    ray = SP[..., np.newaxis] + SLV[..., np.newaxis] * dists[..., np.newaxis, :]
+    return ray, weights
+
+
+def _process_chunk_job(args):
+    """
+    Unpack a job for process_chunk and tag the result with its chunk number
+    """
+    return args[0], process_chunk(*args)
 
 
 def getProjFromWMFile(wm_file):
@@ -278,44 +377,76 @@ def getProjFromWMFile(wm_file):
     Returns the projection of an HDF5 file
     '''
     with h5py.File(wm_file, 'r') as f:
-        wm_proj = CRS.from_json(f['Projection'][()])
-    return wm_proj
+        wm_proj = f['Projection'][()]
+    # h5py 3 returns strings as bytes
+    if isinstance(wm_proj, bytes):
+        wm_proj = wm_proj.decode('utf-8')
+    return CRS.from_json(wm_proj)
 
 
 def interpolate2(fun, x, y, z):
     '''
     helper function to make the interpolation step cleaner
     '''
+    return interpolate_all((fun,), x, y, z)[0]
+
+
+def interpolate_all(funs, x, y, z):
+    '''
+    Evaluate several interpolators that share the same grid (e.g. the wet
+    and hydrostatic refractivity) at the same points. The query points are
+    assembled once and reused for every interpolator.
+    '''
     in_shape = x.shape
-    out = fun((y.ravel(), x.ravel(), z.ravel()))  # note that this re-ordering is on purpose to match the weather model
-    outData = out.reshape(in_shape)
-    return outData
+    # note that this re-ordering is on purpose to match the weather model
+    points = np.stack((y.ravel(), x.ravel(), z.ravel()), axis=-1)
+    return [fun(points).reshape(in_shape) for fun in funs]
 
 
 def _integrateLOS(stepSize, wet_pw, hydro_pw, Npts=None):
+    '''
+    Integrate the wet and hydrostatic refractivity along each ray. The two
+    delays are returned as separate arrays, so each stays contiguous.
+    '''
     delays = []
     for d in (wet_pw, hydro_pw):
         if d.ndim == 1:
             delays.append(np.array([int_fcn(d, stepSize)]))
         else:
             delays.append(_integrate_delays(stepSize, d, Npts))
-    return np.stack(delays, axis=0)
+    return tuple(delays)
+
+
+def _integrateZenith(zs, wet_pw, hydro_pw):
+    '''
+    Integrate the wet and hydrostatic refractivity from each height level in
+    zs up to the top of the grid, along the last axis. The trapezoid area of
+    each layer is computed once, and the integral from every level is then a
+    reversed cumulative sum of the areas above it (zero at the top level).
+    '''
+    dz = np.diff(zs)
+    delays = []
+    for d in (wet_pw, hydro_pw):
+        areas = 0.5 * dz * (d[..., 1:] + d[..., :-1])
+        total = np.zeros(d.shape)
+        total[..., :-1] = np.cumsum(areas[..., ::-1], axis=-1)[..., ::-1]
+        delays.append(1e-6 * total)
+    return delays
 
 
 def _integrate_delays(stepSize, refr, Npts=None):
     '''
     This function gets the actual delays by integrating the refractivity in
-    each node. Refractivity is given in the 'refr' variable.
+    each node. Refractivity is given in the 'refr' variable, with the points
+    along each ray in the last dimension. All of the rays are integrated in a
+    single reduction; if Npts is given, the samples past the end of each ray
+    are masked out.
     '''
-    delays = []
     if Npts is not None:
-        for n, ray in zip(Npts, refr):
-            delays.append(int_fcn(ray, stepSize, n))
-    else:
-        for ray in refr:
-            delays.append(int_fcn(ray, stepSize))
-    return np.array(delays)
+        past_end = np.arange(refr.shape[-1]) >= np.asarray(Npts)[..., np.newaxis]
+        refr = np.where(past_end, np.nan, refr)
+    return int_fcn(refr, stepSize)
 
 
 def int_fcn(y, dx, N=None):
-    return 1e-6 * dx * np.nansum(y[:N])
+    return 1e-6 * dx * np.nansum(y[..., :N], axis=-1)
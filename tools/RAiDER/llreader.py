@@ -10,6 +10,7 @@ import logging
 import os
 
 import numpy as np
+import pandas as pd
 
 from RAiDER.demdownload import download_dem
 from RAiDER.utilFcns import gdal_open
@@ -83,20 +84,16 @@ def getHeights(lats, lons, heights, useWeatherNodes=False):
         if height_data is not None and useWeatherNodes:
             hts = height_data
         elif height_data is not None:
-            hts = height_data
-            latlist, lonlist, hgtlist = [], [], []
-            for ht in hts:
-                latlist.append(lats.flatten())
-                lonlist.append(lons.flatten())
-                hgtlist.append(np.array([ht] * len(lats.flatten())))
-            lats = np.array(latlist).reshape(in_shape + (len(height_data),))
-            lons = np.array(lonlist).reshape(in_shape + (len(height_data),))
-            hts = np.array(hgtlist).reshape(in_shape + (len(height_data),))
+            # Repeat the lat/lons at each height level as read-only views
+            # rather than copies; downstream consumers only read them.
+            out_shape = in_shape + (len(height_data),)
+            lats = np.broadcast_to(lats[..., np.newaxis], out_shape)
+            lons = np.broadcast_to(lons[..., np.newaxis], out_shape)
+            hts = np.broadcast_to(np.asarray(height_data, dtype=np.float64), out_shape)
         else:
             raise RuntimeError('Heights must be specified with height option "lvs"')
 
     elif height_type == 'merge':
-        import pandas as pd
         for f in height_data:
             data = pd.read_csv(f)
             lats = data['Lat'].values
@@ -130,9 +127,8 @@ def checkArg(arg):
     if arg is None:
         return None
     else:
-        import numpy as np
         try:
-            return np.array(arg)
+            return np.asarray(arg)
         except:
             raise RuntimeError('checkArg: Cannot covert argument to numpy arrays')
 
@@ -142,7 +138,6 @@ def readLLFromStationFile(fname):
     Helper fcn for checking argument compatibility
     '''
     try:
-        import pandas as pd
         stats = pd.read_csv(fname)
         return stats['Lat'].values, stats['Lon'].values
     except:
@@ -82,9 +82,9 @@ def state_to_los(t, x, y, z, vx, vy, vz, lats, lons, heights, zref=_ZREF):
         raise RuntimeError('state_to_los: lats and lons must be the same size')
 
     real_shape = lats.shape
-    lats = lats.flatten()
-    lons = lons.flatten()
-    heights = heights.flatten()
+    lats = lats.ravel()
+    lons = lons.ravel()
+    heights = heights.ravel()
 
     geo2rdr_obj = Geo2rdr.PyGeo2rdr()
     geo2rdr_obj.set_orbit(t, x, y, z, vx, vy, vz)
@@ -116,12 +116,24 @@ def state_to_los(t, x, y, z, vx, vy, vz, lats, lons, heights, zref=_ZREF):
     #sp = np.stack(utilFcns.lla2ecef(lats, lons, heights),axis = -1)
     #pt_rng = np.linalg.norm(sp,axis=-1)
     #slant_ranges = slant_ranges - pt_rng
-    los = -loss  # * slant_ranges
-
-    # Have to think about traversal order here. It's easy, though, since
-    # in both orders xs come first, followed by all ys, followed by all
-    # zs.
-    return los.reshape(real_shape + (3,))
+    los = -loss / np.linalg.norm(loss, axis=0)
+
+    # Geo2rdr's slant range is the distance to the sensor, but we only need to
+    # integrate up to the top of the troposphere. The distance along the LOS
+    # to height zref is (zref - h) / cos(incidence), where cos(incidence) is
+    # the projection of the LOS onto the local vertical. Points at or above
+    # zref have nothing left to integrate, so they get no LOS.
+    up = np.stack(utilFcns.rotate_enu2ecef(0, 0, 1, lats, lons))
+    cos_inc = np.sum(los * up, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ranges = np.where(
+            (cos_inc > 0) & (heights < zref), (zref - heights) / cos_inc, np.nan
+        )
+    los = los * ranges
+
+    # los is (3, N), so move the components to the last axis before
+    # restoring the shape of the input grid
+    return los.T.reshape(real_shape + (3,))
 
 
 def read_shelve(filename):
@@ -220,7 +232,7 @@ def read_ESA_Orbit_file(filename, time=None):
     return [t, x, y, z, vx, vy, vz]
 
 
-def infer_sv(los_file, lats, lons, heights, time=None):
+def infer_sv(los_file, lats, lons, heights, zref=_ZREF, time=None):
     """Read an LOS file."""
     # TODO: Change this to a try/except structure
     _, ext = os.path.splitext(los_file)
@@ -234,7 +246,7 @@ def infer_sv(los_file, lats, lons, heights, time=None):
         # as a shelve file, and throw whatever error that does, although
         # the message might be sometimes misleading.
         svs = read_shelve(los_file)
-    LOSs = state_to_los(*svs, lats=lats, lons=lons, heights=heights)
+    LOSs = state_to_los(*svs, lats=lats, lons=lons, heights=heights, zref=zref)
     return LOSs
 
 
@@ -256,7 +268,6 @@ def los_to_lv(incidence, heading, lats, lons, heights, zref, ranges=None):
     east = utilFcns.sind(a_0) * utilFcns.cosd(a_1 + 90)
     north = utilFcns.sind(a_0) * utilFcns.sind(a_1 + 90)
     up = utilFcns.cosd(a_0)
-    east, north, up = np.stack((east, north, up))
 
     # Pick reasonable range to top of troposphere if not provided
     if ranges is None:
@@ -264,15 +275,17 @@ def los_to_lv(incidence, heading, lats, lons, heights, zref, ranges=None):
     #slant_range = ranges = (zref - heights) / utilFcns.cosd(inc)
 
     # Scale look vectors by range
-    east, north, up = np.stack((east, north, up)) * ranges
-
-    xyz = utilFcns.enu2ecef(
-        east.flatten(), north.flatten(), up.flatten(), lats.flatten(),
-        lons.flatten(), heights.flatten())
-
-    sp_xyz = utilFcns.lla2ecef(lats.flatten(), lons.flatten(), heights.flatten())
-    los = np.stack(xyz, axis=-1) - np.stack(sp_xyz, axis=-1)
-    los = los.reshape(east.shape + (3,))
+    east = east * ranges
+    north = north * ranges
+    up = up * ranges
+
+    # The LOS is the difference between the ECEF positions of the top and the
+    # bottom of the ray, which is just the ENU vector rotated into ECEF. The
+    # rotation is elementwise, so write its components straight into the output
+    los = np.empty(east.shape + (3,))
+    los[..., 0], los[..., 1], los[..., 2] = utilFcns.rotate_enu2ecef(
+        east, north, up, lats, lons
+    )
 
     return los
 
@@ -285,9 +298,9 @@ def infer_los(los, lats, lons, heights, zref, time=None):
     los_type, los_file = los
 
     if los_type == 'sv':
-        LOS = infer_sv(los_file, lats, lons, heights, time)
+        LOS = infer_sv(los_file, lats, lons, heights, zref, time)
     elif los_type == 'los':
-        incidence, heading = [f.flatten() for f in utilFcns.gdal_open(los_file)]
+        incidence, heading = [f.ravel() for f in utilFcns.gdal_open(los_file)]
         utilFcns.checkShapes(np.stack((incidence, heading), axis=-1), lats, lons, heights)
         LOS = los_to_lv(incidence, heading, lats, lons, heights, zref)
     else:
@@ -314,11 +327,17 @@ def _getZenithLookVecs(lats, lons, heights, zref=_ZREF):
     if hasattr(zref, "__len__") | isinstance(zref, str):
         raise RuntimeError('_getZenithLookVecs: zref must be a scalar')
 
-    e = np.cos(np.radians(lats)) * np.cos(np.radians(lons))
-    n = np.cos(np.radians(lats)) * np.sin(np.radians(lons))
-    u = np.sin(np.radians(lats))
-    zenLookVecs = (np.array((e, n, u)).T * (zref - heights)[..., np.newaxis])
-    return zenLookVecs.astype(np.float64)
+    # The zenith direction is already a unit vector, so the trig terms are
+    # computed once and the result is only scaled to reach zref
+    lat_rad = np.radians(lats)
+    lon_rad = np.radians(lons)
+    coslat = np.cos(lat_rad)
+
+    e = coslat * np.cos(lon_rad)
+    n = coslat * np.sin(lon_rad)
+    u = np.sin(lat_rad)
+    zenLookVecs = np.stack((e, n, u), axis=-1) * (zref - heights)[..., np.newaxis]
+    return zenLookVecs.astype(np.float64, copy=False)
 
 
 def getLookVectors(look_vecs, lats, lons, heights, zref=_ZREF, time=None):
@@ -330,9 +349,9 @@ def getLookVectors(look_vecs, lats, lons, heights, zref=_ZREF, time=None):
         look_vecs = Zenith
 
     in_shape = lats.shape
-    lat = lats.flatten()
-    lon = lons.flatten()
-    hgt = heights.flatten()
+    lat = lats.ravel()
+    lon = lons.ravel()
+    hgt = heights.ravel()
 
     if look_vecs is Zenith:
         look_vecs = _getZenithLookVecs(lat, lon, hgt, zref=zref)
@@ -342,4 +361,4 @@ def getLookVectors(look_vecs, lats, lons, heights, zref=_ZREF, time=None):
     mask = np.isnan(hgt) | np.isnan(lat) | np.isnan(lon)
     look_vecs[mask, :] = np.nan
 
-    return look_vecs.reshape(in_shape + (3,)).astype(np.float64)
+    return look_vecs.reshape(in_shape + (3,)).astype(np.float64, copy=False)
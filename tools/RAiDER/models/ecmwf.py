@@ -34,31 +34,27 @@ class ECMWF(WeatherModel):
         self._load_model_level(filename)
 
     def _load_model_level(self, fname):
-        from scipy.io import netcdf as nc
-        with nc.netcdf_file(fname, 'r', maskandscale=True) as f:
-            # 0,0 to get first time and first level
-            z = f.variables['z'][0][0].copy()
-            lnsp = f.variables['lnsp'][0][0].copy()
-            t = f.variables['t'][0].copy()
-            qq = f.variables['q'][0].copy()
-            lats = f.variables['latitude'][:].copy()
-            lons = f.variables['longitude'][:].copy()
-            self._levels = f.variables['level'][:].copy()
-
-        # ECMWF appears to give me this backwards
-        if lats[0] > lats[1]:
-            z = z[::-1]
-            lnsp = lnsp[::-1]
-            t = t[:, ::-1]
-            Q = qq[:, ::-1]
-            lats = lats[::-1]
-        # Lons is usually ok, but we'll throw in a check to be safe
-        if lons[0] > lons[1]:
-            z = z[..., ::-1]
-            lnsp = lnsp[..., ::-1]
-            t = t[..., ::-1]
-            Q = qq[..., ::-1]
-            lons = lons[::-1]
+        import xarray
+        with xarray.open_dataset(fname) as ds:
+            # Select and re-order lazily, so only the slices taken below are
+            # read from the file, already in the right order
+            ds = ds.isel(time=0)
+            # ECMWF appears to give me this backwards
+            if ds['latitude'][0] > ds['latitude'][1]:
+                ds = ds.isel(latitude=slice(None, None, -1))
+            # Lons is usually ok, but we'll throw in a check to be safe
+            if ds['longitude'][0] > ds['longitude'][1]:
+                ds = ds.isel(longitude=slice(None, None, -1))
+
+            # z and lnsp are only needed on the first level
+            z = ds['z'].isel(level=0).values
+            lnsp = ds['lnsp'].isel(level=0).values
+            t = ds['t'].values
+            Q = ds['q'].values
+            lats = ds['latitude'].values
+            lons = ds['longitude'].values.copy()
+            self._levels = ds['level'].values
+
         # pyproj gets fussy if the latitude is wrong, plus our
         # interpolator isn't clever enough to pick up on the fact that
         # they are the same
@@ -1,5 +1,6 @@
 import datetime
 import logging
+import math
 import os
 from abc import ABC, abstractmethod
 
@@ -10,7 +11,9 @@ from pyproj import CRS, Transformer
 from RAiDER import constants as const
 from RAiDER import utilFcns as util
 from RAiDER.constants import Zenith
-from RAiDER.delayFcns import _integrateLOS, interpolate2, make_interpolator
+from RAiDER.delayFcns import (
+    _integrateLOS, _integrateZenith, interpolate_all, make_interpolator
+)
 from RAiDER.interpolate import interpolate_along_axis
 from RAiDER.interpolator import fillna3D
 from RAiDER.losreader import getLookVectors
@@ -18,9 +21,41 @@ from RAiDER.makePoints import makePoints3D
 from RAiDER.models import plotWeather as plots
 from RAiDER.utilFcns import lla2ecef, robmax, robmin
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
 log = logging.getLogger(__name__)
 
 
+def _svp_loop(t, t1, t2):
+    '''
+    Saturation vapor pressure (in hPa) for a flat array of temperatures.
+    Fuses the water/ice/blended branches of WeatherModel._find_svp into a
+    single pass, evaluating only the branch that applies to each point.
+    '''
+    svp = np.empty_like(t)
+    for i in prange(t.size):
+        tref = t[i] - t1
+        if t[i] > t1:
+            svp[i] = 6.1121 * math.exp((17.502 * tref) / (240.97 + tref))
+        elif t[i] < t2:
+            svp[i] = 6.1121 * math.exp((22.587 * tref) / (273.86 + tref))
+        else:
+            wgt = (t[i] - t2) / (t1 - t2)
+            svpw = 6.1121 * math.exp((17.502 * tref) / (240.97 + tref))
+            svpi = 6.1121 * math.exp((22.587 * tref) / (273.86 + tref))
+            svp[i] = svpi + (svpw - svpi) * wgt**2
+    return svp
+
+
+# fastmath is deliberately left off, since it would let numba assume there
+# are no NaNs and the weather model grids use NaN as their fill value
+_svp_kernel = njit(parallel=True)(_svp_loop) if njit is not None else None
+
+
 class WeatherModel(ABC):
     '''
     Implement a generic weather model for getting estimated SAR delays
@@ -158,6 +193,7 @@ class WeatherModel(ABC):
         '''
 
         _STEP = 10  # stepsize in meters
+        _CHUNK = 1000  # number of rays traced at a time
 
         if zref is None:
             zref = const._ZREF
@@ -173,44 +209,56 @@ class WeatherModel(ABC):
             p1 = CRS.from_epsg(4978)
             t = Transformer.from_proj(p1, self._proj, always_xy=True)
 
-            # Get the look vectors
-            # TODO: lengths and LOS return from GEO2RDR are not correct
+            # Get the look vectors. Nodes at or above zmax have no LOS
+            # (NaN length), and so no delay.
             lengths = np.linalg.norm(los, axis=-1)
-            max_len = np.nanmax(lengths)
-            los_slv = los / lengths[..., np.newaxis]
+            valid = np.isfinite(lengths) & (lengths > 0)
+            los_slv = los[valid] / lengths[valid][..., np.newaxis]
+            npts = np.ceil(lengths[valid] / _STEP).astype(int)
 
             # Transform each point to ECEF
-            rays_ecef = np.stack(lla2ecef(self._lats, self._lons, hgts), axis=-1)
+            rays_ecef = np.stack(
+                lla2ecef(self._lats[valid], self._lons[valid], hgts[valid]), axis=-1
+            )
 
             # Calculate the integrated delays
             ifWet = make_interpolator(self._xs, self._ys, self._zs, wet)
             ifHydro = make_interpolator(self._xs, self._ys, self._zs, hydro)
 
-            # Create the rays
-            ray = makePoints3D(max_len, rays_ecef, los_slv, _STEP)
-
-            # Transform from ECEF to weather model native projection
-            ray_x, ray_y, ray_z = t.transform(
-                ray[..., 0, :],
-                ray[..., 1, :],
-                ray[..., 2, :]
-            )
+            # Trace the rays a chunk at a time, since each ray holds several
+            # thousand points
+            delay_wet = np.zeros(len(npts))
+            delay_hydro = np.zeros(len(npts))
+            for start in range(0, len(npts), _CHUNK):
+                block = slice(start, start + _CHUNK)
+                ray = makePoints3D(
+                    npts[block].max() * _STEP,
+                    rays_ecef[block, np.newaxis, np.newaxis],
+                    los_slv[block, np.newaxis, np.newaxis],
+                    _STEP
+                )[:, 0, 0]
+
+                # Transform from ECEF to weather model native projection
+                ray_x, ray_y, ray_z = t.transform(
+                    ray[:, 0, :],
+                    ray[:, 1, :],
+                    ray[:, 2, :]
+                )
 
-            delay_wet = interpolate2(ifWet, ray_x, ray_y, ray_z)
-            delay_hydro = interpolate2(ifHydro, ray_x, ray_y, ray_z)
-            delays = _integrateLOS(_STEP, delay_wet, delay_hydro)
+                delay_wet[block], delay_hydro[block] = _integrateLOS(
+                    _STEP,
+                    *interpolate_all((ifWet, ifHydro), ray_x, ray_y, ray_z),
+                    Npts=npts[block]
+                )
 
-            self._wet_total = delays[..., 0]
-            self._hydrostatic_total = delays[..., 1]
+            self._wet_total = np.zeros(lengths.shape)
+            self._hydrostatic_total = np.zeros(lengths.shape)
+            self._wet_total[valid] = delay_wet
+            self._hydrostatic_total[valid] = delay_hydro
 
         else:
             # If LOS is not supplied, return integrated ZTD
-            wet_total, hydro_total = np.zeros(wet.shape), np.zeros(hydro.shape)
-            # TODO: This returns zero for the last level because of the way trapz handles single points.
-            # Should probably try to re-implement the integral function
-            for level in range(wet.shape[2]):
-                wet_total[..., level] = 1e-6 * np.trapz(wet[..., level:], x=self._zs[level:], axis=2)
-                hydro_total[..., level] = 1e-6 * np.trapz(hydro[..., level:], x=self._zs[level:], axis=2)
+            wet_total, hydro_total = _integrateZenith(self._zs, wet, hydro)
             self._hydrostatic_total = hydro_total
             self._wet_total = wet_total
 
@@ -415,16 +463,32 @@ class WeatherModel(ABC):
         t1 = 273.15  # O Celsius
         t2 = 250.15  # -23 Celsius
 
-        tref = self._t - t1
-        wgt = (self._t - t2) / (t1 - t2)
+        # Use the compiled single-pass kernel if numba is available
+        if _svp_kernel is not None:
+            temp = np.ascontiguousarray(np.ma.filled(self._t, np.nan), dtype=np.float64)
+            svp = _svp_kernel(temp.ravel(), t1, t2).reshape(temp.shape)
+            self._svp = svp * 100
+            return
+
+        # Otherwise evaluate each branch only where it applies: water above
+        # t1, ice below t2, and a blend of the two in between
+        temp = np.ma.filled(self._t, np.nan)
+        warm = temp > t1
+        cold = temp < t2
+        mid = ~(warm | cold)
+        svp = np.empty(temp.shape)
+
+        tref = temp[warm] - t1
+        svp[warm] = 6.1121 * np.exp((17.502 * tref) / (240.97 + tref))
+
+        tref = temp[cold] - t1
+        svp[cold] = 6.1121 * np.exp((22.587 * tref) / (273.86 + tref))
+
+        tref = temp[mid] - t1
+        wgt = (temp[mid] - t2) / (t1 - t2)
         svpw = (6.1121 * np.exp((17.502 * tref) / (240.97 + tref)))
         svpi = (6.1121 * np.exp((22.587 * tref) / (273.86 + tref)))
-
-        svp = svpi + (svpw - svpi) * wgt**2
-        ix_bound1 = self._t > t1
-        svp[ix_bound1] = svpw[ix_bound1]
-        ix_bound2 = self._t < t2
-        svp[ix_bound2] = svpi[ix_bound2]
+        svp[mid] = svpi + (svpw - svpi) * wgt**2
 
         self._svp = svp * 100
 
@@ -443,13 +507,16 @@ class WeatherModel(ABC):
                            the input points
             geoheight    - The geopotential heights
         '''
-        geopotential = np.zeros_like(self._t)
-        pressurelvs = np.zeros_like(geopotential)
-        geoheight = np.zeros_like(geopotential)
+        # Work with NaN-filled arrays, so that missing values propagate
+        # through the cumulative sums below the same way they would through
+        # a level-by-level integration
+        z = np.ma.filled(z, np.nan)
+        t = np.ma.filled(self._t, np.nan)
+        q = np.ma.filled(self._q, np.nan)
 
         # surface pressure: pressure at the surface!
         # Note that we integrate from the ground up, so from the largest model level to 0
-        sp = np.exp(lnsp)
+        sp = np.exp(np.ma.filled(lnsp, np.nan))
 
         # t should be structured [z, y, x]
         levelSize = len(self._levels)
@@ -460,52 +527,43 @@ class WeatherModel(ABC):
                 'and b have lengths {} and {} respectively. Of '.format(len(self._a), len(self._b)) +
                 'course, these three numbers should be equal.')
 
-        Ph_levplusone = self._a[levelSize] + (self._b[levelSize] * sp)
-
-        # Integrate up into the atmosphere from *lowest level*
-        z_h = 0  # initial value
-        for lev, t_level, q_level in zip(
-                range(levelSize, 0, -1), self._t[::-1], self._q[::-1]):
-
-            # lev is the level number 1-60, we need a corresponding index
-            # into ts and qs
-            # ilevel = levelSize - lev # << this was Ray's original, but is a typo
-            # because indexing like that results in pressure and height arrays that
-            # are in the opposite orientation to the t/q arrays.
-            ilevel = lev - 1
-
-            # compute moist temperature
-            t_level = t_level * (1 + 0.609133 * q_level)
-
-            # compute the pressures (on half-levels)
-            Ph_lev = self._a[lev - 1] + (self._b[lev - 1] * sp)
-
-            pressurelvs[ilevel] = Ph_lev
-
-            if lev == 1:
-                dlogP = np.log(Ph_levplusone / 0.1)
-                alpha = np.log(2)
-            else:
-                dlogP = np.log(Ph_levplusone / Ph_lev)
-                dP = Ph_levplusone - Ph_lev
-                alpha = 1 - ((Ph_lev / dP) * dlogP)
-
-            TRd = t_level * self._R_d
-
-            # z_f is the geopotential of this full level
-            # integrate from previous (lower) half-level z_h to the full level
-            z_f = z_h + TRd * alpha
-            # geoheight[ilevel] = z_f/self._g0
-
-            # Geopotential (add in surface geopotential)
-            geopotential[ilevel] = z_f + z
-            geoheight[ilevel] = geopotential[ilevel] / self._g0
+        # compute the pressures on all of the half-levels at once; level
+        # ilevel lies between half-levels ilevel and ilevel + 1
+        a = np.asarray(self._a)[:, np.newaxis, np.newaxis]
+        b = np.asarray(self._b)[:, np.newaxis, np.newaxis]
+        Ph = a + b * sp
+        Ph_lev = Ph[:-1]
+        Ph_levplusone = Ph[1:]
+        pressurelvs = Ph_lev
+
+        # The top half-level pressure is zero, so the top level is patched
+        # below with its own boundary values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            dlogP = np.log(Ph_levplusone / Ph_lev)
+            alpha = 1 - ((Ph_lev / (Ph_levplusone - Ph_lev)) * dlogP)
+        dlogP[0] = np.log(Ph_levplusone[0] / 0.1)
+        alpha[0] = np.log(2)
+
+        # compute moist temperature
+        TRd = t * (1 + 0.609133 * q) * self._R_d
+
+        # z_h is the geopotential of the 'half-levels'. Integrating up into
+        # the atmosphere from the *lowest level*, the half-level below each
+        # level is the sum of the contributions of all the levels beneath it
+        # (zero below the lowest level)
+        dz_h = TRd * dlogP
+        z_h = np.concatenate(
+            (np.cumsum(dz_h[:0:-1], axis=0)[::-1], np.zeros_like(dz_h[-1:])),
+            axis=0
+        )
 
-            # z_h is the geopotential of 'half-levels'
-            # integrate z_h to next half level
-            z_h += TRd * dlogP
+        # z_f is the geopotential of each full level, integrated from the
+        # half-level z_h below it to the full level
+        z_f = z_h + TRd * alpha
 
-            Ph_levplusone = Ph_lev
+        # Geopotential (add in surface geopotential)
+        geopotential = z_f + z
+        geoheight = geopotential / self._g0
 
         return geopotential, pressurelvs, geoheight
 
@@ -4,7 +4,9 @@ from textwrap import dedent
 
 from RAiDER.checkArgs import checkArgs
 from RAiDER.cli.parser import add_bbox, add_out, add_verbose
-from RAiDER.cli.validators import DateListAction, date_type, time_type
+from RAiDER.cli.validators import (
+    DateListAction, IntegerType, date_type, time_type
+)
 from RAiDER.constants import _ZREF
 from RAiDER.delay import tropo_delay
 from RAiDER.logger import logger
@@ -114,6 +116,12 @@ def create_parser():
         '--outformat',
         help='GDAL-compatible file format if surface delays are requested.',
         default=None)
+    misc.add_argument(
+        '--nGauss',
+        help=('Integrate each ray with this many Gauss-Legendre points instead '
+              'of sampling it at a fixed step. Default: fixed step'),
+        type=IntegerType(1),
+        default=None)
 
     add_out(misc)
 
@@ -148,7 +156,8 @@ def parseCMD():
     for t, wfn, hfn in zip(times, wetNames, hydroNames):
         try:
             (_, _) = tropo_delay(los, lats, lons, ll_bounds, heights, flag, weather_model, wmLoc, zref,
-                                 outformat, t, out, download_only, wfn, hfn)
+                                 outformat, t, out, download_only, wfn, hfn,
+                                 nGauss=args.nGauss)
 
         except RuntimeError:
             log.exception("Date %s failed", t)
@@ -1,4 +1,5 @@
 """Geodesy-related utility functions."""
+import functools
 import importlib
 import logging
 import multiprocessing as mp
@@ -30,10 +31,17 @@ def cosd(x):
 
 
 def lla2ecef(lat, lon, height):
-    ecef = pyproj.Proj(proj='geocent')
-    lla = pyproj.Proj(proj='latlong')
+    """
+    Return ECEF coordinates from WGS84 lat/lon/height. The inputs may be
+    arrays of any (matching) shape and are transformed in a single call.
+    """
+    return _lla2ecef_transformer().transform(lon, lat, height)
+
 
-    return pyproj.transform(lla, ecef, lon, lat, height, always_xy=True)
+@functools.lru_cache(maxsize=None)
+def _lla2ecef_transformer():
+    """Build the WGS84 geodetic to geocentric transformer once."""
+    return pyproj.Transformer.from_crs(4326, 4978, always_xy=True)
 
 
 def enu2ecef(east, north, up, lat0, lon0, h0):
@@ -41,18 +49,31 @@ def enu2ecef(east, north, up, lat0, lon0, h0):
     # I'm looking at
     # https://github.com/scivision/pymap3d/blob/master/pymap3d/__init__.py
     x0, y0, z0 = lla2ecef(lat0, lon0, h0)
-
-    t = cosd(lat0) * up - sind(lat0) * north
-    w = sind(lat0) * up + cosd(lat0) * north
-
-    u = cosd(lon0) * t - sind(lon0) * east
-    v = sind(lon0) * t + cosd(lon0) * east
+    u, v, w = rotate_enu2ecef(east, north, up, lat0, lon0)
 
     my_ecef = np.stack((x0 + u, y0 + v, z0 + w))
 
     return my_ecef
 
 
+def rotate_enu2ecef(east, north, up, lat0, lon0):
+    """
+    Rotate vectors given in local east/north/up components into the ECEF
+    frame. Unlike enu2ecef, the result is not offset by the position of the
+    origin, so no geodetic transform is needed.
+    """
+    coslat, sinlat = cosd(lat0), sind(lat0)
+    coslon, sinlon = cosd(lon0), sind(lon0)
+
+    t = coslat * up - sinlat * north
+    w = sinlat * up + coslat * north
+
+    u = coslon * t - sinlon * east
+    v = sinlon * t + coslon * east
+
+    return u, v, w
+
+
 def gdal_open(fname, returnProj=False, userNDV=None):
     if os.path.exists(fname + '.vrt'):
         fname = fname + '.vrt'
@@ -63,28 +84,24 @@ def gdal_open(fname, returnProj=False, userNDV=None):
     proj = ds.GetProjection()
     gt = ds.GetGeoTransform()
 
-    val = []
+    # Read all of the bands with a single call; for more than one band GDAL
+    # returns them already stacked as (bands, rows, cols)
+    data = ds.ReadAsArray()
     for band in range(ds.RasterCount):
         b = ds.GetRasterBand(band + 1)  # gdal counts from 1, not 0
-        data = b.ReadAsArray()
+        band_data = data if ds.RasterCount == 1 else data[band]
         if userNDV is not None:
             log.debug('Using user-supplied NoDataValue')
-            data[data == userNDV] = np.nan
+            band_data[band_data == userNDV] = np.nan
         else:
             try:
                 ndv = b.GetNoDataValue()
-                data[data == ndv] = np.nan
+                band_data[band_data == ndv] = np.nan
             except:
                 log.debug('NoDataValue attempt failed*******')
-        val.append(data)
         b = None
     ds = None
 
-    if len(val) > 1:
-        data = np.stack(val)
-    else:
-        data = val[0]
-
     if not returnProj:
         return data
     else:
@@ -150,25 +167,12 @@ def writeArrayToFile(lats, lons, array, filename, noDataValue=-9999):
 
 
 def round_date(date, precision):
-    # First try rounding up
-    # Timedelta since the beginning of time
-    datedelta = datetime.min - date
-    # Round that timedelta to the specified precision
-    rem = datedelta % precision
-    # Add back to get date rounded up
-    round_up = date + rem
-
-    # Next try rounding down
-    datedelta = date - datetime.min
-    rem = datedelta % precision
-    round_down = date - rem
-
-    # It's not the most efficient to calculate both and then choose, but
-    # it's clear, and performance isn't critical here.
-    up_diff = round_up - date
-    down_diff = date - round_down
-
-    return round_up if up_diff < down_diff else round_down
+    # Timedelta since the beginning of time, modulo the precision, is how far
+    # the date is past the previous multiple of the precision. Ties round down.
+    rem = (date - datetime.min) % precision
+    if rem <= precision / 2:
+        return date - rem
+    return date + (precision - rem)
 
 
 def _least_nonzero(a):
@@ -446,7 +450,9 @@ def writePnts2HDF5(lats, lons, hgts, los, outName='testx.h5', chunkSize=None, no
 
         start_positions = f.create_dataset('Rays_SP', in_shape + (3,), chunks=los.chunks, dtype='<f8', fillvalue=noDataValue)
         lengths = f.create_dataset('Rays_len', in_shape, chunks=x.chunks, dtype='<f8', fillvalue=noDataValue)
-        scaled_look_vecs = f.create_dataset('Rays_SLV', in_shape + (3,), chunks=los.chunks, dtype='<f8', fillvalue=noDataValue)
+        # Unit vectors only need single precision (~1 mm over a 15 km ray);
+        # they are cast back to double when the rays are built
+        scaled_look_vecs = f.create_dataset('Rays_SLV', in_shape + (3,), chunks=los.chunks, dtype='<f4', fillvalue=noDataValue)
 
         los.attrs['grid_mapping'] = np.string_(projname)
         start_positions.attrs['grid_mapping'] = np.string_(projname)
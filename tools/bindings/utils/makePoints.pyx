@@ -33,7 +33,7 @@ def makePoints0D(double max_len, cnp.ndarray[double, ndim=1] Rays_SP, cnp.ndarra
         Npts = int(max_len//stepSize)
 
     cdef cnp.ndarray[npy_float64, ndim = 2, mode = 'c'] ray = np.empty((3, Npts), dtype=np.float64)
-    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(0, max_len+stepSize, stepSize) 
+    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(Npts, dtype=np.float64) * stepSize
 
     for k3 in range(3):
         for k4 in range(Npts):
@@ -65,7 +65,7 @@ def makePoints1D(double max_len, cnp.ndarray[double, ndim=2] Rays_SP, cnp.ndarra
 
     cdef int nrow = Rays_SP.shape[0]
     cdef cnp.ndarray[npy_float64, ndim = 3, mode = 'c'] ray = np.empty((nrow, 3, Npts), dtype=np.float64)
-    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(0, max_len+stepSize, stepSize) 
+    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(Npts, dtype=np.float64) * stepSize
 
     for k1 in range(nrow):
         for k3 in range(3):
@@ -100,7 +100,7 @@ def makePoints2D(double max_len, cnp.ndarray[double, ndim=3] Rays_SP, cnp.ndarra
     cdef int nrow = Rays_SP.shape[0]
     cdef int ncol = Rays_SP.shape[1]
     cdef cnp.ndarray[npy_float64, ndim = 4, mode = 'c'] ray = np.empty((nrow, ncol, 3, Npts), dtype=np.float64)
-    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(0, max_len+stepSize, stepSize) 
+    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(Npts, dtype=np.float64) * stepSize
 
     for k1 in range(nrow):
         for k2 in range(ncol):
@@ -137,7 +137,7 @@ def makePoints3D(double max_len, cnp.ndarray[double, ndim=4] Rays_SP, cnp.ndarra
     cdef int ncol = Rays_SP.shape[1]
     cdef int nz = Rays_SP.shape[2]
     cdef cnp.ndarray[npy_float64, ndim = 5, mode = 'c'] ray = np.empty((nrow, ncol, nz, 3, Npts), dtype=np.float64)
-    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(0, max_len+stepSize, stepSize) 
+    cdef cnp.ndarray[npy_float64, ndim = 1, mode = 'c'] basespace = np.arange(Npts, dtype=np.float64) * stepSize
 
     for k1 in range(nrow):
         for k2 in range(ncol):